@@ -13,6 +13,9 @@ unique_id=$2  # Use the provided unique_id
 mkdir -p ${unique_id}/left
 mkdir -p ${unique_id}/right
 
+# The exit status is the readiness signal for the downloader:
+# it only fetches images once this script exits successfully.
+
 # Capture a snapshot from camera 0
 if libcamera-still --camera 0 --autofocus-on-capture --quality 95 --ev 2 -o ${unique_id}/left/${unique_id}_${epoch}_left.jpg; then
     echo "Snapshot taken from camera 0"
@@ -22,7 +25,9 @@ if libcamera-still --camera 0 --autofocus-on-capture --quality 95 --ev 2 -o ${un
         echo "Snapshot taken from camera 1"
     else
         echo "Failed to capture snapshot from camera 1"
+        exit 1
     fi
 else
     echo "Failed to capture snapshot from camera 0"
+    exit 1
 fi
\ No newline at end of file
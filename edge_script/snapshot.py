@@ -1,22 +1,125 @@
 import paramiko
-from scp import SCPClient, SCPException
+import atexit
+import errno
+import hashlib
 import os
+import random
+import re
+import shlex
+import shutil
+import subprocess
+import tarfile
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 import logging
+import logging.handlers
+import queue
 from stat import S_ISREG
 
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.StreamHandler(), logging.FileHandler("ssh_download.log")],
-)
+try:
+    import zstandard
+except ImportError:  # Optional, only needed for compressed batched transfers
+    zstandard = None
+
+
+# Configure logging; callers only enqueue records, a listener thread does the writes
+_log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+_log_handlers = [logging.StreamHandler(), logging.FileHandler("ssh_download.log")]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+# Only merge args into the message here; the listener's handlers add the prefix
+_queue_handler.setFormatter(logging.Formatter("%(message)s"))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
+# OpenSSH multiplexing socket, shared by the ssh config snippet and CLI tools
+CONTROL_PATH = "~/.ssh/cm_%r@%h:%p"
+CONTROL_PERSIST = "10m"
+
+# Channel flow control: a deep window keeps many SFTP reads in flight on high-latency links
+WINDOW_SIZE = 2**27
+MAX_PACKET_SIZE = 2**15
+
+# Skip SHA-1 Diffie-Hellman key exchanges and every non-GCM cipher, so the
+# handshake settles on AES-GCM (hardware AES via OpenSSL); needs paramiko >= 3.3
+DISABLED_ALGORITHMS = {
+    "kex": [
+        "diffie-hellman-group1-sha1",
+        "diffie-hellman-group14-sha1",
+        "diffie-hellman-group-exchange-sha1",
+    ],
+    "ciphers": [
+        "aes128-ctr",
+        "aes192-ctr",
+        "aes256-ctr",
+        "aes128-cbc",
+        "aes192-cbc",
+        "aes256-cbc",
+        "3des-cbc",
+    ],
+}
+
+# One line of `sha256sum` output: digest, then " " (text) or "*" (binary), then path
+SHA256SUM_LINE = re.compile(r"^([0-9a-f]{64}) [ *](.+)$")
+
+# Retry backoff: retry_delay doubles per attempt up to this cap, plus random jitter
+MAX_RETRY_DELAY = 30
+RETRY_JITTER = 1.5
+
+# Local write size when copying downloaded data to disk
+COPY_BUFSIZE = 1 << 20
+
+# Files at least this large are fetched as parallel byte ranges on separate channels
+CHUNKED_MIN_SIZE = 4 << 20
+DOWNLOAD_CHUNKS = 4
+
+# Connected clients reused across downloader instances, keyed by (hostname, port, username)
+_SHARED_CLIENTS: Dict[Tuple[str, int, str], paramiko.SSHClient] = {}
+
+
+@atexit.register
+def _close_shared_clients():
+    """Close persisted SSH connections on interpreter exit"""
+    while _SHARED_CLIENTS:
+        _, client = _SHARED_CLIENTS.popitem()
+        client.close()
+
+
+def _sha256_file(path: str) -> str:
+    """Return the hex SHA-256 digest of a local file"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(COPY_BUFSIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _preallocate(fd: int, size: int):
+    """Reserve size bytes of contiguous disk space for fd, failing early on ENOSPC
+
+    The file takes its full size at once, so callers must remove it if the
+    transfer fails.
+    """
+    if size <= 0 or not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except OSError as e:
+        # Filesystem without fallocate support; blocks get allocated on write instead
+        if e.errno not in (errno.EOPNOTSUPP, errno.EINVAL):
+            raise
+
 
 class SSHDownloader:
+    _hostkeys_cache: Optional[paramiko.HostKeys] = None
+
     def __init__(
         self,
         hostname: str,
@@ -25,6 +128,7 @@ class SSHDownloader:
         password: str,
         max_retries: int = 3,
         retry_delay: int = 5,
+        persist: bool = True,
     ):
         self.hostname = hostname
         self.port = port
@@ -32,50 +136,144 @@ class SSHDownloader:
         self.password = password
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.persist = persist
         self.ssh_client = None
+        self._sftp_lock = threading.Lock()
+        self._sftp_local = threading.local()
+        self._sftp_sessions: List[paramiko.SFTPClient] = []
 
     def __enter__(self):
         self.connect()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.close()
+        if self.persist:
+            self._close_sftp()
+        else:
+            self.close()
+
+    @property
+    def _client_key(self) -> Tuple[str, int, str]:
+        return (self.hostname, self.port, self.username)
+
+    def _backoff(self, attempt: int) -> float:
+        """Seconds to wait after a failed attempt: exponential, capped, with jitter"""
+        delay = min(MAX_RETRY_DELAY, self.retry_delay * 2 ** (attempt - 1))
+        return delay + random.uniform(0, RETRY_JITTER)
+
+    @classmethod
+    def _load_known_hosts_cached(cls) -> paramiko.HostKeys:
+        """Parse ~/.ssh/known_hosts once and share it across instances"""
+        if cls._hostkeys_cache is None:
+            host_keys = paramiko.HostKeys()
+            try:
+                host_keys.load(os.path.expanduser("~/.ssh/known_hosts"))
+            except IOError:
+                pass
+            cls._hostkeys_cache = host_keys
+        return cls._hostkeys_cache
+
+    def _open_sftp(self) -> paramiko.SFTPClient:
+        """Open an SFTP session; serialized so parallel downloads can share the transport"""
+        with self._sftp_lock:
+            return self.ssh_client.open_sftp()
+
+    @property
+    def sftp(self) -> paramiko.SFTPClient:
+        """SFTP session of the calling thread, opened once and kept until close()"""
+        sftp = getattr(self._sftp_local, "sftp", None)
+        # Reopen if a failed transfer took the cached session's channel down
+        if sftp is None or sftp.get_channel().closed:
+            sftp = self._open_sftp()
+            self._sftp_local.sftp = sftp
+            with self._sftp_lock:
+                self._sftp_sessions.append(sftp)
+        return sftp
+
+    def _close_sftp(self):
+        """Close every SFTP session opened through the sftp property"""
+        with self._sftp_lock:
+            sessions, self._sftp_sessions = self._sftp_sessions, []
+        self._sftp_local = threading.local()
+        for sftp in sessions:
+            try:
+                sftp.close()
+            except Exception as e:
+                logger.error("Error closing SFTP session: %s", e)
+
+    def ssh_config_snippet(self) -> str:
+        """Return an ~/.ssh/config block enabling connection multiplexing for CLI tools"""
+        return (
+            f"Host {self.hostname}\n"
+            f"    User {self.username}\n"
+            f"    Port {self.port}\n"
+            f"    ControlMaster auto\n"
+            f"    ControlPath {CONTROL_PATH}\n"
+            f"    ControlPersist {CONTROL_PERSIST}\n"
+        )
 
     def connect(self):
-        """Establish SSH connection with retries"""
+        """Establish SSH connection with retries, reusing a live shared client"""
+        if self.persist:
+            client = _SHARED_CLIENTS.get(self._client_key)
+            transport = client.get_transport() if client else None
+            if transport is not None and transport.is_active():
+                logger.info("Reusing established SSH connection")
+                self.ssh_client = client
+                return
+            if client is not None:
+                # Drop the dead connection before establishing a fresh one
+                del _SHARED_CLIENTS[self._client_key]
+                client.close()
+
+        client = paramiko.SSHClient()
+        # Equivalent to load_system_host_keys(); paramiko never writes these
+        client._system_host_keys = self._load_known_hosts_cached()
+        client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
         for attempt in range(1, self.max_retries + 1):
             try:
                 logger.info(
-                    f"Attempting SSH connection (attempt {attempt}/{self.max_retries})"
+                    "Attempting SSH connection (attempt %d/%d)",
+                    attempt,
+                    self.max_retries,
                 )
-                self.ssh_client = paramiko.SSHClient()
-                self.ssh_client.load_system_host_keys()
-                self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-                self.ssh_client.connect(
+                client.connect(
                     self.hostname,
                     port=self.port,
                     username=self.username,
                     password=self.password,
                     timeout=30,
                     banner_timeout=30,
+                    disabled_algorithms=DISABLED_ALGORITHMS,
                 )
+                transport = client.get_transport()
+                transport.default_window_size = WINDOW_SIZE
+                transport.default_max_packet_size = MAX_PACKET_SIZE
                 logger.info("SSH connection established successfully")
+                self.ssh_client = client
+                if self.persist:
+                    _SHARED_CLIENTS[self._client_key] = client
                 return
             except Exception as e:
-                logger.error(f"SSH connection failed (attempt {attempt}): {str(e)}")
+                logger.error("SSH connection failed (attempt %d): %s", attempt, e)
+                # Drop the failed transport; the client is reused for the next attempt
+                client.close()
                 if attempt == self.max_retries:
                     raise
-                time.sleep(self.retry_delay)
-                self.close()
+                time.sleep(self._backoff(attempt))
 
     def close(self):
-        """Close SSH connection if it exists"""
+        """Close SFTP sessions and the SSH connection if it exists"""
+        self._close_sftp()
         if self.ssh_client:
+            if _SHARED_CLIENTS.get(self._client_key) is self.ssh_client:
+                del _SHARED_CLIENTS[self._client_key]
             try:
                 self.ssh_client.close()
                 logger.info("SSH connection closed")
             except Exception as e:
-                logger.error(f"Error closing SSH connection: {str(e)}")
+                logger.error("Error closing SSH connection: %s", e)
             finally:
                 self.ssh_client = None
 
@@ -83,7 +281,7 @@ class SSHDownloader:
         """Execute remote command with retries"""
         for attempt in range(1, self.max_retries + 1):
             try:
-                logger.info(f"Executing command (attempt {attempt}): {command}")
+                logger.info("Executing command (attempt %d): %s", attempt, command)
                 stdin, stdout, stderr = self.ssh_client.exec_command(
                     command, timeout=60
                 )
@@ -91,7 +289,7 @@ class SSHDownloader:
 
                 errors = stderr.read().decode().strip()
                 if errors:
-                    logger.warning(f"Command produced stderr output: {errors}")
+                    logger.warning("Command produced stderr output: %s", errors)
 
                 if exit_status != 0:
                     raise Exception(f"Command failed with exit status {exit_status}")
@@ -99,80 +297,331 @@ class SSHDownloader:
                 output = stdout.read().decode().strip()
                 return output if output else None
             except Exception as e:
-                logger.error(f"Command execution failed (attempt {attempt}): {str(e)}")
+                logger.error("Command execution failed (attempt %d): %s", attempt, e)
                 if attempt == self.max_retries:
                     raise
-                time.sleep(self.retry_delay)
+                time.sleep(self._backoff(attempt))
 
-    def remote_file_exists(self, remote_path: str) -> bool:
-        """Check if remote file exists and is a regular file"""
-        try:
-            sftp = self.ssh_client.open_sftp()
+    def run_and_fetch(
+        self,
+        command: str,
+        remote_dir: str,
+        files: Dict[str, str],
+        compress: bool = False,
+        timeout: Optional[float] = None,
+    ) -> Tuple[List[str], Dict[str, str]]:
+        """Run command, then stream files back as one tar archive on the same channel
+
+        files maps paths relative to remote_dir onto local destination paths.
+        With compress, the archive is piped through `zstd -1` on the remote side,
+        which needs zstd there and the zstandard package locally.
+        timeout bounds each read of the stream, including the wait for command to
+        finish; None waits as long as the command runs.
+        Each file is checked against a SHA-256 digest computed on the remote side.
+        Returns the relative paths that were received and verified, and the
+        remote digests by relative path for reuse when downloading the rest.
+        """
+        if compress and zstandard is None:
+            logger.warning("zstandard is not installed, fetching uncompressed")
+            compress = False
+
+        members = " ".join(shlex.quote(name) for name in files)
+        # Command output and digests go to stderr so stdout carries only the archive
+        batched = (
+            f"{command} >&2 && cd {shlex.quote(remote_dir)} && "
+            f"sha256sum -- {members} >&2 && tar -cf - {members}"
+        )
+        if compress:
+            batched = f"set -o pipefail; {batched} | zstd -1 -c"
+        received = {}
+        for attempt in range(1, self.max_retries + 1):
             try:
-                file_stat = sftp.stat(remote_path)
-                return S_ISREG(file_stat.st_mode)
-            except IOError:
-                return False
-            finally:
-                sftp.close()
+                logger.info(
+                    "Executing batched command (attempt %d): %s", attempt, batched
+                )
+                stdin, stdout, stderr = self.ssh_client.exec_command(
+                    batched, timeout=timeout
+                )
+                break
+            except Exception as e:
+                logger.error(
+                    "Batched command failed to start (attempt %d): %s", attempt, e
+                )
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._backoff(attempt))
+        stream = (
+            zstandard.ZstdDecompressor().stream_reader(stdout) if compress else stdout
+        )
+        try:
+            with tarfile.open(fileobj=stream, mode="r|") as tar:
+                for member in tar:
+                    local_path = files.get(member.name)
+                    if local_path is None or not member.isreg():
+                        logger.warning(
+                            "Skipping unexpected archive member: %s", member.name
+                        )
+                        continue
+                    digest = hashlib.sha256()
+                    try:
+                        with tar.extractfile(member) as src, open(
+                            local_path, "wb"
+                        ) as dst:
+                            for block in iter(lambda: src.read(COPY_BUFSIZE), b""):
+                                digest.update(block)
+                                dst.write(block)
+                    except Exception:
+                        if os.path.exists(local_path):
+                            os.remove(local_path)  # Remove partial file
+                        raise
+                    received[member.name] = digest.hexdigest()
         except Exception as e:
-            logger.error(f"Error checking remote file existence: {str(e)}")
-            return False
+            logger.error("Batched transfer failed: %s", e)
+            # Stop the remote side instead of waiting on an unread stream
+            stdout.channel.close()
+
+        exit_status = stdout.channel.recv_exit_status()
+        errors = stderr.read().decode().strip()
+        if errors:
+            logger.info("Command stderr output: %s", errors)
+        if exit_status != 0:
+            logger.error("Batched command failed with exit status %d", exit_status)
+
+        remote_digests = {}
+        for line in errors.splitlines():
+            match = SHA256SUM_LINE.match(line)
+            if match:
+                remote_digests[match.group(2)] = match.group(1)
+
+        fetched = []
+        for name, digest in received.items():
+            if remote_digests.get(name) == digest:
+                fetched.append(name)
+                logger.info("Received %s via batched transfer, checksum verified", name)
+            else:
+                logger.error("Checksum mismatch for %s, discarding", name)
+                os.remove(files[name])
+        return fetched, remote_digests
+
+    def remote_sha256(self, remote_path: str) -> str:
+        """Return the SHA-256 digest of a remote file, computed on the remote side"""
+        output = self.execute_command(f"sha256sum -- {shlex.quote(remote_path)}")
+        if not output:
+            raise Exception(f"sha256sum produced no output for {remote_path}")
+        return output.split()[0]
+
+    def _remote_stat(self, remote_path: str) -> Optional[paramiko.SFTPAttributes]:
+        """Stat remote path, returning None unless it is an existing regular file"""
+        try:
+            file_stat = self.sftp.stat(remote_path)
+        except IOError:
+            return None
+        except Exception as e:
+            logger.error("Error checking remote file existence: %s", e)
+            return None
+        return file_stat if S_ISREG(file_stat.st_mode) else None
 
-    def download_file(self, remote_path: str, local_path: str) -> bool:
-        """Download file with verification and retries"""
-        if not self.remote_file_exists(remote_path):
-            logger.error(f"Remote file does not exist: {remote_path}")
+    def remote_file_exists(self, remote_path: str) -> bool:
+        """Check if remote file exists and is a regular file"""
+        return self._remote_stat(remote_path) is not None
+
+    def _download_stream(
+        self, remote_path: str, local_path: str, remote_size: int
+    ) -> str:
+        """Copy remote file in one SFTP stream, prefetching so reads are pipelined
+
+        Returns the SHA-256 digest of the data written, hashed while copying.
+        """
+        digest = hashlib.sha256()
+        with self.sftp.open(remote_path, "rb") as remote_file:
+            remote_file.prefetch(remote_size)
+            fd = os.open(
+                local_path,
+                os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0),
+                0o644,
+            )
+            with os.fdopen(fd, "wb", buffering=0) as local_file:
+                _preallocate(fd, remote_size)
+                # Write each block straight to the fd, no Python-level buffering
+                for block in iter(lambda: remote_file.read(COPY_BUFSIZE), b""):
+                    digest.update(block)
+                    view = memoryview(block)
+                    while view:
+                        view = view[local_file.write(view) :]
+                # Release reserved space a short transfer left unwritten
+                local_file.truncate()
+        return digest.hexdigest()
+
+    def _download_chunked(
+        self, remote_path: str, local_path: str, remote_size: int
+    ) -> str:
+        """Copy remote file as DOWNLOAD_CHUNKS byte ranges fetched concurrently
+
+        Returns the SHA-256 digest of the written file. Ranges complete out of
+        order, so it is hashed once all of them are on disk.
+        """
+        chunk_size = -(-remote_size // DOWNLOAD_CHUNKS)
+        ranges = [
+            (start, min(chunk_size, remote_size - start))
+            for start in range(0, remote_size, chunk_size)
+        ]
+        fd = os.open(local_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            _preallocate(fd, remote_size)
+            os.ftruncate(fd, remote_size)
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                list(
+                    executor.map(
+                        lambda r: self._fetch_range(remote_path, fd, *r), ranges
+                    )
+                )
+        finally:
+            os.close(fd)
+        return _sha256_file(local_path)
+
+    def _fetch_range(self, remote_path: str, fd: int, start: int, length: int):
+        """Read one byte range over its own SFTP channel and write it in place"""
+        end = start + length
+        blocks = [
+            (offset, min(COPY_BUFSIZE, end - offset))
+            for offset in range(start, end, COPY_BUFSIZE)
+        ]
+        sftp = self._open_sftp()
+        try:
+            with sftp.open(remote_path, "rb") as remote_file:
+                # readv issues the READ requests for all blocks up front
+                for (offset, size), data in zip(blocks, remote_file.readv(blocks)):
+                    if len(data) != size:
+                        raise IOError(f"Short read at offset {offset} of {remote_path}")
+                    os.pwrite(fd, data, offset)
+        finally:
+            sftp.close()
+
+    def download_file(
+        self, remote_path: str, local_path: str, remote_digest: Optional[str] = None
+    ) -> bool:
+        """Download file with verification and retries
+
+        remote_digest is the file's known SHA-256; without it the digest is
+        computed remotely with one extra command once a download has the right size.
+        """
+        # One stat serves as both the existence check and the expected size
+        file_stat = self._remote_stat(remote_path)
+        if file_stat is None:
+            logger.error("Remote file does not exist: %s", remote_path)
             return False
+        remote_size = file_stat.st_size
 
         for attempt in range(1, self.max_retries + 1):
             try:
                 logger.info(
-                    f"Attempting download (attempt {attempt}): {remote_path} -> {local_path}"
+                    "Attempting download (attempt %d): %s -> %s",
+                    attempt,
+                    remote_path,
+                    local_path,
                 )
 
-                # Get remote file size for verification
-                sftp = self.ssh_client.open_sftp()
-                remote_size = sftp.stat(remote_path).st_size
-                sftp.close()
-
-                # Download the file
-                with SCPClient(
-                    self.ssh_client.get_transport(), socket_timeout=60
-                ) as scp:
-                    scp.get(remote_path, local_path=local_path)
+                # Download the file, splitting large ones into parallel ranges
+                if remote_size >= CHUNKED_MIN_SIZE and hasattr(os, "pwrite"):
+                    local_digest = self._download_chunked(
+                        remote_path, local_path, remote_size
+                    )
+                else:
+                    local_digest = self._download_stream(
+                        remote_path, local_path, remote_size
+                    )
 
                 # Verify local file
-                if os.path.exists(local_path):
-                    local_size = os.path.getsize(local_path)
-                    if local_size == remote_size:
-                        logger.info("Download completed and verified successfully")
-                        return True
-                    else:
+                try:
+                    local_size = os.stat(local_path).st_size
+                except FileNotFoundError:
+                    logger.error("Downloaded file not found at local path")
+                else:
+                    size_mismatch = local_size != remote_size
+                    if size_mismatch:
                         logger.error(
-                            f"File size mismatch: remote={remote_size}, local={local_size}"
+                            "File size mismatch: remote=%d, local=%d",
+                            remote_size,
+                            local_size,
                         )
-                        os.remove(local_path)  # Remove corrupted file
-                else:
-                    logger.error("Downloaded file not found at local path")
+                    else:
+                        if remote_digest is None:
+                            remote_digest = self.remote_sha256(remote_path)
+                        if local_digest == remote_digest:
+                            logger.info("Download completed and verified successfully")
+                            return True
+                        logger.error("Checksum mismatch for %s", local_path)
+                    os.remove(local_path)  # Remove corrupted file
+
+                    if size_mismatch and attempt < self.max_retries:
+                        # The remote file may have been rewritten; re-stat it
+                        file_stat = self._remote_stat(remote_path)
+                        if file_stat is None:
+                            logger.error("Remote file does not exist: %s", remote_path)
+                            return False
+                        remote_size = file_stat.st_size
+                        remote_digest = None
 
                 if attempt == self.max_retries:
                     return False
 
-                time.sleep(self.retry_delay)
-            except SCPException as e:
-                logger.error(f"SCP download failed (attempt {attempt}): {str(e)}")
-                if attempt == self.max_retries:
-                    raise
-                time.sleep(self.retry_delay)
+                time.sleep(self._backoff(attempt))
             except Exception as e:
-                logger.error(f"Download failed (attempt {attempt}): {str(e)}")
+                logger.error("Download failed (attempt %d): %s", attempt, e)
+                # A preallocated file already has its final size; never leave it behind
+                if os.path.exists(local_path):
+                    os.remove(local_path)  # Remove partial file
                 if attempt == self.max_retries:
                     raise
-                time.sleep(self.retry_delay)
+                time.sleep(self._backoff(attempt))
 
         return False
 
+    def download_file_rsync(
+        self, remote_path: str, local_path: str, remote_digest: Optional[str] = None
+    ) -> bool:
+        """Download file with rsync over a multiplexed OpenSSH connection
+
+        Needs key-based auth, as ssh runs in batch mode. Falls back to
+        download_file() when rsync or ssh is missing or the transfer fails.
+        """
+        if shutil.which("rsync") is None or shutil.which("ssh") is None:
+            logger.info("rsync/ssh not found, using SFTP download")
+            return self.download_file(remote_path, local_path, remote_digest)
+
+        ssh_command = (
+            f"ssh -p {self.port} -o BatchMode=yes -o ControlMaster=auto "
+            f"-o ControlPath={CONTROL_PATH} -o ControlPersist={CONTROL_PERSIST}"
+        )
+        logger.info("Attempting rsync download: %s -> %s", remote_path, local_path)
+        try:
+            subprocess.run(
+                [
+                    "rsync",
+                    "-a",
+                    "--inplace",
+                    "-e",
+                    ssh_command,
+                    f"{self.username}@{self.hostname}:{remote_path}",
+                    local_path,
+                ],
+                check=True,
+                capture_output=True,
+                timeout=120,
+            )
+        except subprocess.CalledProcessError as e:
+            logger.warning(
+                "rsync download failed, falling back to SFTP: %s",
+                e.stderr.decode().strip(),
+            )
+            return self.download_file(remote_path, local_path, remote_digest)
+        except subprocess.TimeoutExpired:
+            logger.warning("rsync download timed out, falling back to SFTP")
+            return self.download_file(remote_path, local_path, remote_digest)
+
+        logger.info("rsync download completed successfully")
+        return True
+
 
 def main():
     # Configuration - Update these as needed
@@ -184,7 +633,9 @@ def main():
         "unique_id": "C250416_v0.1",
         "max_retries": 5,
         "retry_delay": 10,
-        "command_delay": 15,  # Increased delay for processing time
+        "compress": False,  # Requires zstd on the Pi and zstandard locally
+        "prefer_rsync": False,  # Requires rsync and key-based SSH auth
+        "command_timeout": None,  # Stream read timeout (s); None waits for capture
     }
 
     # Prepare local directories
@@ -204,28 +655,51 @@ def main():
             max_retries=config["max_retries"],
             retry_delay=config["retry_delay"],
         ) as downloader:
-            # Trigger the snapshot script
+            # Trigger the snapshot script and stream both images back on one channel
+            remote_dir = f"/home/pi/{config['unique_id']}"
+            downloads = {}
+            for side in ["left", "right"]:
+                remote_name = f"{side}/{config['unique_id']}_{epoch}_{side}.jpg"
+                downloads[remote_name] = os.path.join(
+                    base_local_dir, side, os.path.basename(remote_name)
+                )
+
             logger.info("Executing snapshot script...")
-            downloader.execute_command(
-                f"bash /home/pi/take_snap_shot.bash {epoch} {config['unique_id']}"
+            fetched, remote_digests = downloader.run_and_fetch(
+                f"bash /home/pi/take_snap_shot.bash {epoch} {config['unique_id']}",
+                remote_dir,
+                downloads,
+                compress=config["compress"],
+                timeout=config["command_timeout"],
             )
-            time.sleep(config["command_delay"])
-
-            # Download images for both sides
-            success = True
-            for side in ["left", "right"]:
-                remote_dir = f"/home/pi/{config['unique_id']}/{side}"
-                remote_file = f"{remote_dir}/{config['unique_id']}_{epoch}_{side}.jpg"
-                local_subdir = os.path.join(base_local_dir, side)
-                local_file = os.path.join(local_subdir, os.path.basename(remote_file))
 
-                os.makedirs(local_subdir, exist_ok=True)
+            # Fall back to per-file downloads for anything the stream did not deliver,
+            # running them in parallel on separate SFTP channels of the one transport
+            # Each entry holds the (remote_path, local_path, remote_digest) arguments
+            pending = [
+                (
+                    f"{remote_dir}/{remote_name}",
+                    local_file,
+                    remote_digests.get(remote_name),
+                )
+                for remote_name, local_file in downloads.items()
+                if remote_name not in fetched
+            ]
+            download = (
+                downloader.download_file_rsync
+                if config["prefer_rsync"]
+                else downloader.download_file
+            )
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                results = list(executor.map(lambda args: download(*args), pending))
 
-                if not downloader.download_file(remote_file, local_file):
-                    logger.error(f"Failed to download {remote_file}")
+            success = True
+            for (remote_file, *_), downloaded in zip(pending, results):
+                if not downloaded:
+                    logger.error("Failed to download %s", remote_file)
                     success = False
                 else:
-                    logger.info(f"Successfully downloaded {remote_file}")
+                    logger.info("Successfully downloaded %s", remote_file)
 
             if success:
                 logger.info("All images downloaded successfully")
@@ -233,7 +707,7 @@ def main():
                 logger.error("Some images failed to download")
 
     except Exception as e:
-        logger.error(f"Critical error in main process: {str(e)}")
+        logger.error("Critical error in main process: %s", e)
         raise
 
 